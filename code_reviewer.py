@@ -12,10 +12,95 @@ import os
 import sys
 import re
 import argparse
+import fnmatch
+import functools
+import io
 import json
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Set, Generator, Optional
-import requests
+from typing import Callable, List, FrozenSet, Tuple, Generator, Optional, Pattern
+
+try:
+    import orjson
+except ImportError:  # Optional speedup, fall back to the stdlib json module
+    orjson = None
+
+
+# File extensions for the -L/--language filter
+_LANG_EXTS = {
+    'python': frozenset({'.py'}),
+    'javascript': frozenset({'.js', '.jsx', '.ts', '.tsx'}),
+    'java': frozenset({'.java'}),
+    'cpp': frozenset({'.cpp', '.cc', '.cxx', '.hpp', '.hh', '.h'}),
+    'c': frozenset({'.c', '.h'}),
+    'go': frozenset({'.go'}),
+    'rust': frozenset({'.rs'}),
+    'ruby': frozenset({'.rb'}),
+    'php': frozenset({'.php'}),
+    'html': frozenset({'.html', '.htm'}),
+    'css': frozenset({'.css'}),
+    'markdown': frozenset({'.md', '.markdown'}),
+}
+
+# A collected file with its relative path parts and relative path string
+_FileEntry = Tuple[Path, Tuple[str, ...], str]
+
+# An entry paired with its sanitized content (None if it could not be read)
+_Document = Tuple[_FileEntry, Optional[str]]
+
+# Largest prompt sent as a single request before the review is split
+_MAX_PROMPT_CHARS = 400000
+
+# Approximate amount of file content per request when a review is split
+_BATCH_CHARS = 30000
+
+# Maximum number of concurrent API requests when a review is batched
+_API_WORKERS = 4
+
+# posix_fadvise is only available on Linux and some other Unixes
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+# Number of files opened and prefetched together, kept well below fd limits
+_PREFETCH_WINDOW = 256
+
+# Always-ignored hidden files, first alternative of every ignore regex
+_HIDDEN_FILES_PATTERN = r"\..*"
+
+# Translation table for _sanitize_for_json: drop null bytes, map CR to LF
+_SANITIZE_TABLE = str.maketrans({'\x00': None, '\r': '\n'})
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize obj to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _json_loads(data):
+    """Parse JSON from bytes or str, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _compile_ignore_regex(globs: List[str]) -> Pattern:
+    """Compile translated glob patterns into one anchored alternation.
+    
+    Hidden files (leading '.') are matched by the first alternative, so a
+    single match decides whether a name is ignored.
+    """
+    return re.compile("(?:" + "|".join([_HIDDEN_FILES_PATTERN] + globs) + ")")
+
+
+_HIDDEN_FILES_REGEX = _compile_ignore_regex([])
+
+
+def _tree_node() -> defaultdict:
+    """Create a directory-layout tree node whose missing children are nodes."""
+    return defaultdict(_tree_node)
 
 
 class CodeReviewer:
@@ -24,6 +109,12 @@ class CodeReviewer:
     def __init__(self):
         self.api_key = self._get_api_key()
         self.system_prompt = self._load_system_prompt()
+        self._ignore_literals: FrozenSet[str] = frozenset()
+        self._ignore_regex: Pattern = _HIDDEN_FILES_REGEX
+        
+        # Created on first API call, see _get_session()
+        self._session = None
+        self._session_lock = threading.Lock()
     
     def _get_api_key(self) -> str:
         """Get API key from environment variable."""
@@ -52,216 +143,356 @@ and improvements. Focus on practical recommendations."""
             print(f"Error reading system_prompt.txt: {e}", file=sys.stderr)
             sys.exit(1)
     
-    def _should_ignore(self, file_path: Path, ignore_patterns: Set[str]) -> bool:
-        """Check if a file should be ignored based on patterns."""
-        # Always ignore hidden files and common directories
-        if file_path.name.startswith('.'):
-            return True
-        
-        # Check ignore patterns
-        for pattern in ignore_patterns:
-            pattern = pattern.strip()
-            if not pattern or pattern.startswith('#'):
-                continue
-            
-            # Convert simple glob patterns to regex
-            if '*' in pattern or '?' in pattern:
-                regex_pattern = re.escape(pattern)
-                regex_pattern = regex_pattern.replace(r'\*', '.*').replace(r'\?', '.')
-                if re.match(f"^{regex_pattern}$", file_path.name):
-                    return True
-            elif file_path.name == pattern:
-                return True
-        
-        return False
+    def _should_ignore(self, name: str) -> bool:
+        """Check if a file name should be ignored based on the loaded patterns."""
+        # Hidden files are always ignored; the regex matches them as well
+        return name in self._ignore_literals or self._ignore_regex.match(name) is not None
     
-    def _load_ignore_patterns(self, ignore_file: Optional[str]) -> Set[str]:
-        """Load ignore patterns from file."""
-        ignore_patterns = set()
+    def _load_ignore_patterns(self, ignore_file: Optional[str]) -> Tuple[FrozenSet[str], Pattern]:
+        """Load ignore patterns from file.
         
+        Returns the literal file names and a single precompiled regex
+        matching hidden files and any of the glob patterns.
+        """
         if not ignore_file:
-            return ignore_patterns
+            return frozenset(), _HIDDEN_FILES_REGEX
         
         try:
-            with open(ignore_file, 'r', encoding='utf-8') as f:
-                ignore_patterns = {line.strip() for line in f if line.strip()}
+            stat = os.stat(ignore_file)
+            return self._compile_ignore_file(os.path.abspath(ignore_file), stat.st_mtime_ns, stat.st_size)
         except FileNotFoundError:
             print(f"Warning: Ignore file '{ignore_file}' not found", file=sys.stderr)
         except Exception as e:
             print(f"Warning: Error reading ignore file: {e}", file=sys.stderr)
         
-        return ignore_patterns
+        return frozenset(), _HIDDEN_FILES_REGEX
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _compile_ignore_file(path: str, mtime_ns: int, size: int) -> Tuple[FrozenSet[str], Pattern]:
+        """Parse and compile an ignore file.
+        
+        Cached on (path, mtime_ns, size), so repeated reviews in the same
+        process reuse the matcher until the file changes.
+        """
+        literals = set()
+        globs = []
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                pattern = line.strip()
+                if not pattern or pattern.startswith('#'):
+                    continue
+                
+                # fnmatch handles *, ? and [...] classes and anchors the end
+                if any(char in pattern for char in '*?['):
+                    globs.append(fnmatch.translate(pattern))
+                else:
+                    literals.add(pattern)
+        
+        return frozenset(literals), _compile_ignore_regex(globs)
     
     def _collect_files(
         self,
         path: Path,
         recursive: bool = False,
-        ignore_patterns: Optional[Set[str]] = None,
         language_filter: Optional[str] = None
     ) -> Generator[Path, None, None]:
         """Collect files for review."""
-        if ignore_patterns is None:
-            ignore_patterns = set()
-        
         if path.is_file():
-            if not self._should_ignore(path, ignore_patterns):
+            if not self._should_ignore(path.name):
                 yield path
             return
         
-        # Handle directory
+        allowed_exts = _LANG_EXTS.get(language_filter.lower()) if language_filter else None
+        allowed_suffixes = tuple(allowed_exts) if allowed_exts else None
+        yield from self._scan_directory(str(path), recursive, allowed_suffixes)
+    
+    def _scan_directory(
+        self,
+        dir_path: str,
+        recursive: bool,
+        allowed_suffixes: Optional[Tuple[str, ...]]
+    ) -> Generator[Path, None, None]:
+        """Walk a directory with os.scandir, reusing the cached entry types."""
         try:
-            for item in path.iterdir():
-                if self._should_ignore(item, ignore_patterns):
-                    continue
-                
-                if item.is_file():
-                    if language_filter:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if self._should_ignore(entry.name):
+                        continue
+                    
+                    if entry.is_file():
                         # Simple language filtering by extension
-                        extensions = {
-                            'python': ['.py'],
-                            'javascript': ['.js', '.jsx', '.ts', '.tsx'],
-                            'java': ['.java'],
-                            'cpp': ['.cpp', '.cc', '.cxx', '.hpp', '.hh', '.h'],
-                            'c': ['.c', '.h'],
-                            'go': ['.go'],
-                            'rust': ['.rs'],
-                            'ruby': ['.rb'],
-                            'php': ['.php'],
-                            'html': ['.html', '.htm'],
-                            'css': ['.css'],
-                            'markdown': ['.md', '.markdown'],
-                        }
+                        if allowed_suffixes and not entry.name.lower().endswith(allowed_suffixes):
+                            continue
                         
-                        if language_filter.lower() in extensions:
-                            if item.suffix.lower() not in extensions[language_filter.lower()]:
-                                continue
-                    
-                    yield item
-                elif item.is_dir() and recursive:
-                    yield from self._collect_files(item, recursive, ignore_patterns, language_filter)
+                        yield Path(entry.path)
+                    elif entry.is_dir() and recursive:
+                        yield from self._scan_directory(entry.path, recursive, allowed_suffixes)
         except PermissionError:
-            print(f"Warning: No permission to access {path}", file=sys.stderr)
+            print(f"Warning: No permission to access {dir_path}", file=sys.stderr)
     
-    def _build_directory_layout(self, root_path: Path, files: List[Path]) -> str:
-        """Build hierarchical directory layout string."""
-        if not files:
+    def _build_file_entries(self, root_path: Path, files: List[Path]) -> List[_FileEntry]:
+        """Pair each file with its path parts and string relative to root_path."""
+        entries = []
+        for file_path in files:
+            rel_path = file_path.relative_to(root_path)
+            entries.append((file_path, rel_path.parts, str(rel_path)))
+        return entries
+    
+    def _build_directory_layout(self, root_path: Path, entries: List[_FileEntry]) -> str:
+        """Build hierarchical directory layout string from pre-sorted entries."""
+        if not entries:
             return "Directory layout: No files found.\n\n"
         
-        # Create a tree structure
-        tree = {}
+        # Create a tree structure; directories are created on first access
+        tree = _tree_node()
         
-        for file_path in sorted(files):
-            rel_path = file_path.relative_to(root_path)
-            parts = rel_path.parts
-            
+        for _, parts, _ in entries:
             # Navigate/construct the tree
             current = tree
             for part in parts[:-1]:  # All but the last part (filename)
-                if part not in current:
-                    current[part] = {}
                 current = current[part]
             
             # Mark the last part as a file
-            filename = parts[-1]
-            if parts[-1] not in current:
-                current[filename] = None  # None indicates a file (leaf node)
-    
-        def build_tree_lines(node, prefix="", is_last=True, depth=0):
-            """Recursively build tree lines."""
-            lines = []
+            current[parts[-1]] = None  # None indicates a file (leaf node)
+        
+        def sorted_items(node):
+            """Sort: directories first, then files."""
+            return sorted(node.items(), key=lambda x: (x[1] is not None, x[0]))
+        
+        layout = io.StringIO()
+        layout.write(f"{root_path.name}/\n")
+        
+        # Walk the tree depth-first with an explicit stack. Each item carries
+        # the prefix and is_last flag of its parent level plus its own
+        # position, pushed in reverse so siblings pop in sorted order.
+        items = sorted_items(tree)
+        stack = deque(
+            (name, subtree, "", True, 0, i == len(items) - 1)
+            for i, (name, subtree) in reversed(list(enumerate(items)))
+        )
+        
+        while stack:
+            name, subtree, prefix, is_last, depth, is_last_item = stack.pop()
             
-            if not node:
-                return lines
+            # Determine connector
+            if depth == 0:
+                connector = ""
+            else:
+                connector = "└── " if is_last else "├── "
             
-            # Sort: directories first, then files
-            items = sorted(node.items(), key=lambda x: (x[1] is not None, x[0]))
+            layout.write(prefix)
+            layout.write(connector)
+            layout.write(name)
             
-            for i, (name, subtree) in enumerate(items):
-                is_last_item = i == len(items) - 1
-                
-                # Determine connector
-                if depth == 0:
-                    connector = ""
-                else:
-                    connector = "└── " if is_last else "├── "
-                
-                # Build the line
-                line = prefix + connector + name
-                
-                if subtree is None:  # It's a file
-                    lines.append(line)
-                else:  # It's a directory
-                    lines.append(line + "/")
-                    # Determine next prefix
-                    if depth == 0:
-                        next_prefix = ""
-                    else:
-                        next_prefix = prefix + ("    " if is_last else "│   ")
-                    
-                    # Recursively add subtree
-                    lines.extend(build_tree_lines(
-                        subtree, 
-                        next_prefix, 
-                        is_last_item,
-                        depth + 1
-                    ))
+            if subtree is None:  # It's a file
+                layout.write("\n")
+                continue
+            
+            # It's a directory
+            layout.write("/\n")
             
-            return lines
+            # Determine next prefix
+            if depth == 0:
+                next_prefix = ""
+            else:
+                next_prefix = prefix + ("    " if is_last else "│   ")
+            
+            children = sorted_items(subtree)
+            last_index = len(children) - 1
+            for i in range(last_index, -1, -1):
+                child_name, child_subtree = children[i]
+                stack.append((
+                    child_name,
+                    child_subtree,
+                    next_prefix,
+                    is_last_item,
+                    depth + 1,
+                    i == last_index
+                ))
+        
+        layout.write("\n")
+        return layout.getvalue()
+    
+    def _open_file(self, file_path: Path) -> int:
+        """Open a file for a raw binary read."""
+        return os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    
+    def _prefetch_file(self, file_path: Path) -> Optional[int]:
+        """Open a file and ask the kernel to start reading it in the background.
+        
+        Returns None if the file can't be opened; the read step reopens it
+        and reports the error.
+        """
+        try:
+            fd = self._open_file(file_path)
+        except OSError:
+            return None
         
-        # Build the tree lines
-        lines = [f"{root_path.name}/"] + build_tree_lines(tree)
-        return "\n".join(lines) + "\n\n"
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass  # Only a hint, the read still works without it
+        return fd
     
-    def _read_file_safely(self, file_path: Path) -> Optional[str]:
-        """Read file content safely with proper encoding handling."""
+    def _read_file_bytes(self, fd: int) -> bytes:
+        """Read a whole open file with a single read call sized from fstat."""
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        
+        # Very large files may need more than one read
+        if len(data) < size:
+            chunks = [data]
+            remaining = size - len(data)
+            while remaining > 0:
+                chunk = os.read(fd, remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            data = b"".join(chunks)
+        
+        return data
+    
+    def _read_file_safely(self, file_path: Path, fd: Optional[int] = None) -> Optional[str]:
+        """Read file content safely with proper encoding handling.
+        
+        Takes ownership of fd if one was already opened for file_path.
+        """
+        try:
+            if fd is None:
+                fd = self._open_file(file_path)
+            try:
+                data = self._read_file_bytes(fd)
+            finally:
+                os.close(fd)
+        except Exception as e:
+            print(f"Warning: Error reading {file_path}: {e}", file=sys.stderr)
+            return None
+        
         try:
-            return file_path.read_text(encoding='utf-8')
+            return data.decode('utf-8')
         except UnicodeDecodeError:
             try:
                 # Try other common encodings
-                return file_path.read_text(encoding='latin-1')
+                return data.decode('latin-1')
             except:
                 print(f"Warning: Could not read {file_path} (binary file?)", file=sys.stderr)
                 return None
-        except Exception as e:
-            print(f"Warning: Error reading {file_path}: {e}", file=sys.stderr)
-            return None
     
-    def _build_prompt(self, root_path: Path, files: List[Path]) -> str:
-        """Build the complete prompt for API."""
-        # Build directory layout
-        dir_layout = self._build_directory_layout(root_path, files)
-
-        print(dir_layout)
+    def _read_files(self, entries: List[_FileEntry]) -> List[_Document]:
+        """Read and sanitize the files of all entries, keeping their order.
+        
+        Unreadable files are kept with None content so they still show up
+        in the directory layout.
+        """
+        paths = [entry[0] for entry in entries]
+        contents = []
         
-        # Build file contents
-        file_contents = []
+        # Reads are I/O bound and release the GIL, so overlap them in threads;
+        # map() keeps the results in the same order as entries
+        with ThreadPoolExecutor(max_workers=min(32, len(paths) or 1)) as executor:
+            if _HAS_FADVISE:
+                # Open a window of files and hint all of them to the kernel
+                # before reading, so cold-cache disk reads for the whole
+                # window are queued at once rather than 32 at a time
+                for start in range(0, len(paths), _PREFETCH_WINDOW):
+                    window = paths[start:start + _PREFETCH_WINDOW]
+                    fds = list(executor.map(self._prefetch_file, window))
+                    contents.extend(executor.map(self._read_file_safely, window, fds))
+            else:
+                contents.extend(executor.map(self._read_file_safely, paths))
+        
+        return [
+            (entry, None if content is None else self._sanitize_for_json(content))
+            for entry, content in zip(entries, contents)
+        ]
+    
+    def _truncate_for_prompt(self, root_path: Path, document: _Document) -> _Document:
+        """Cut a document so a batch holding only that file fits in _MAX_PROMPT_CHARS."""
+        entry, content = document
         
-        for file_path in sorted(files):
-            content = self._read_file_safely(file_path)
+        # Files within a normal batch size can't come near the limit
+        if content is None or len(content) <= _BATCH_CHARS:
+            return document
+        
+        # Layout and marker overhead of a prompt containing just this file
+        overhead = len(self._build_prompt(root_path, [(entry, "")]))
+        if overhead + len(content) <= _MAX_PROMPT_CHARS:
+            return document
+        
+        # Reserve room for the note, sized for the largest possible count
+        note_size = len(f"\n... [truncated {len(content)} characters] ...\n")
+        keep = max(0, _MAX_PROMPT_CHARS - overhead - note_size)
+        omitted = len(content) - keep
+        
+        print(f"Warning: {entry[2]} does not fit in a single request, truncating", file=sys.stderr)
+        return entry, content[:keep] + f"\n... [truncated {omitted} characters] ...\n"
+    
+    def _split_into_batches(self, documents: List[_Document]) -> List[List[_Document]]:
+        """Group consecutive documents into batches of about _BATCH_CHARS of content."""
+        batches = []
+        batch = []
+        batch_size = 0
+        
+        for document in documents:
+            size = len(document[1] or "")
+            if batch and batch_size + size > _BATCH_CHARS:
+                batches.append(batch)
+                batch = []
+                batch_size = 0
+            batch.append(document)
+            batch_size += size
+        
+        if batch:
+            batches.append(batch)
+        
+        return batches
+    
+    def _build_prompt(
+        self,
+        root_path: Path,
+        documents: List[_Document],
+        dir_layout: Optional[str] = None
+    ) -> str:
+        """Build the complete prompt for API from pre-sorted documents."""
+        # Build directory layout of the files in this prompt
+        if dir_layout is None:
+            dir_layout = self._build_directory_layout(root_path, [entry for entry, _ in documents])
+        
+        # Write everything into one buffer instead of collecting interim strings
+        prompt = io.StringIO()
+        prompt.write(dir_layout)
+        
+        for (_, _, rel_path), content in documents:
             if content is None:
                 continue
-
-            sanitized_content = self._sanitize_for_json(content)
             
-            rel_path = file_path.relative_to(root_path)
-            file_contents.append(f"\n+++ {rel_path} START +++\n")
-            file_contents.append(sanitized_content)
-            file_contents.append(f"\n+++ {rel_path} END +++\n")
+            prompt.write("\n+++ ")
+            prompt.write(rel_path)
+            prompt.write(" START +++\n")
+            prompt.write(content)
+            prompt.write("\n+++ ")
+            prompt.write(rel_path)
+            prompt.write(" END +++\n")
         
-        prompt = dir_layout + "".join(file_contents)
-        return prompt
+        return prompt.getvalue()
     
     def _sanitize_for_json(self, content: str) -> str:
         """Clean content for safe JSON embedding."""
         if not content:
             return ""
     
-        # Remove null bytes and other problematic characters
-        content = content.replace('\x00', '')
-    
-        # Normalize line endings
-        content = content.replace('\r\n', '\n').replace('\r', '\n')
+        # Most files are clean LF text, only rewrite those that need it
+        has_cr = '\r' in content
+        if has_cr or '\x00' in content:
+            # Collapse CRLF first so the table below doesn't turn it into two newlines
+            if has_cr:
+                content = content.replace('\r\n', '\n')
+            
+            # Remove null bytes and normalize lone CRs in a single pass
+            content = content.translate(_SANITIZE_TABLE)
     
         # Ensure the string ends with a newline to avoid truncation issues
         if not content.endswith('\n'):
@@ -269,14 +500,38 @@ and improvements. Focus on practical recommendations."""
     
         return content
     
-    def _call_deepseek_api(self, prompt: str) -> Optional[str]:
-        """Call DeepSeek API with the prompt."""
-        url = "https://api.deepseek.com/v1/chat/completions"
+    def _get_session(self):
+        """Return the shared HTTP session, creating it on first use.
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        requests is imported here rather than at module level so that help,
+        argument errors and other runs that never reach the API start fast.
+        One session reuses its connection pool (keep-alive, TLS) for all calls.
+        """
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                
+                session = requests.Session()
+                session.headers.update({
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                })
+                self._session = session
+            return self._session
+    
+    def _call_deepseek_api(
+        self,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Optional[str]:
+        """Call DeepSeek API with the prompt, streaming the response.
+        
+        Each piece of generated text is passed to on_token as soon as it
+        arrives; the complete response is returned when the stream ends.
+        """
+        import requests
+        
+        url = "https://api.deepseek.com/v1/chat/completions"
         
         payload = {
             "model": "deepseek-chat",
@@ -286,25 +541,53 @@ and improvements. Focus on practical recommendations."""
             ],
             "temperature": 0.1,
             "max_tokens": 4000,
-            "stream": False
+            "stream": True
         }
         
         try:
-            print("Calling DeepSeek API...", file=sys.stderr)
-            response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=60)
-            response.raise_for_status()
+            # Single write so concurrent batch requests don't interleave lines
+            sys.stderr.write("Calling DeepSeek API...\n")
+            with self._get_session().post(url, data=_json_dumps(payload), timeout=60, stream=True) as response:
+                response.raise_for_status()
+                
+                # Lines stay raw bytes: the JSON parser decodes UTF-8 itself,
+                # so no intermediate str is built per event
+                parts = []
+                for line in response.iter_lines():
+                    # Server-sent events: skip keep-alives and comments
+                    if not line or not line.startswith(b"data:"):
+                        continue
+                    
+                    data = line[len(b"data:"):].strip()
+                    if data == b"[DONE]":
+                        break
+                    
+                    choices = _json_loads(data)["choices"]
+                    if not choices:
+                        continue
+                    
+                    token = choices[0]["delta"].get("content")
+                    if token:
+                        parts.append(token)
+                        if on_token is not None:
+                            on_token(token)
             
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+            return "".join(parts)
         except requests.exceptions.RequestException as e:
             print(f"API Error: {e}", file=sys.stderr)
             if hasattr(e, 'response') and e.response:
                 print(f"Response: {e.response.text}", file=sys.stderr)
             return None
-        except KeyError:
+        except (KeyError, ValueError):
             print(f"Unexpected API response format", file=sys.stderr)
             return None
     
+    def _print_results_header(self) -> None:
+        """Print the banner shown above the review output."""
+        print("\n" + "="*80)
+        print("CODE REVIEW RESULTS")
+        print("="*80 + "\n")
+    
     def review(self, args) -> bool:
         """Main review method."""
         target_path = Path(args.target)
@@ -317,13 +600,12 @@ and improvements. Focus on practical recommendations."""
         is_file = target_path.is_file()
         
         # Load ignore patterns
-        ignore_patterns = self._load_ignore_patterns(args.ignore_file)
+        self._ignore_literals, self._ignore_regex = self._load_ignore_patterns(args.ignore_file)
         
-        # Collect files
-        files = list(self._collect_files(
+        # Collect files, sorted once for both the layout and the prompt
+        files = sorted(self._collect_files(
             target_path,
             recursive=args.recursive,
-            ignore_patterns=ignore_patterns,
             language_filter=args.language
         ))
         
@@ -339,20 +621,68 @@ and improvements. Focus on practical recommendations."""
         else:
             root_path = target_path
         
-        # Build prompt
-        prompt = self._build_prompt(root_path, files)
+        # Build the layout of the whole tree, then read all files
+        entries = self._build_file_entries(root_path, files)
+        dir_layout = self._build_directory_layout(root_path, entries)
+        print(dir_layout)
+        
+        documents = self._read_files(entries)
+        
+        prompt = self._build_prompt(root_path, documents, dir_layout)
+        
+        if len(prompt) <= _MAX_PROMPT_CHARS:
+            print(f"Prompt size: {len(prompt)} characters", file=sys.stderr)
+            return self._review_prompt(prompt)
+        
+        # Too large for one request: split it, cutting any file that can't
+        # fit in a batch of its own
+        documents = [self._truncate_for_prompt(root_path, document) for document in documents]
+        batches = self._split_into_batches(documents)
+        print(
+            f"Prompt size: {len(prompt)} characters, exceeds {_MAX_PROMPT_CHARS} character limit, "
+            f"splitting into {len(batches)} batches",
+            file=sys.stderr
+        )
+        del prompt
+        prompts = [self._build_prompt(root_path, batch) for batch in batches]
+        return self._review_batches(prompts, batches)
+    
+    def _review_prompt(self, prompt: str) -> bool:
+        """Review a single prompt, printing the review as it streams in."""
+        header_printed = False
+        
+        def print_token(token: str) -> None:
+            nonlocal header_printed
+            if not header_printed:
+                self._print_results_header()
+                header_printed = True
+            sys.stdout.write(token)
+            sys.stdout.flush()
+        
+        response = self._call_deepseek_api(prompt, on_token=print_token)
         
-        # Call API
-        response = self._call_deepseek_api(prompt)
+        if header_printed:
+            print()
         
-        if response:
-            print("\n" + "="*80)
-            print("CODE REVIEW RESULTS")
-            print("="*80 + "\n")
+        return bool(response)
+    
+    def _review_batches(self, prompts: List[str], batches: List[List[_Document]]) -> bool:
+        """Review several prompts concurrently and print results in order."""
+        with ThreadPoolExecutor(max_workers=min(_API_WORKERS, len(prompts))) as executor:
+            responses = list(executor.map(self._call_deepseek_api, prompts))
+        
+        if any(responses):
+            self._print_results_header()
+        
+        for index, (batch, response) in enumerate(zip(batches, responses), start=1):
+            if not response:
+                continue
+            first, last = batch[0][0][2], batch[-1][0][2]
+            print(f"--- Batch {index}/{len(batches)}: {first} .. {last} ---\n")
             print(response)
-            return True
-        else:
-            return False
+            print()
+        
+        return all(responses)
 
 
 def parse_arguments():